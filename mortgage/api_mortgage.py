@@ -3,10 +3,12 @@ import os
 from dotenv import load_dotenv
 
 from mortgage.service import service
+from mortgage.service.admission import AdmissionController, Overloaded, estimate_cost
 
 
 load_dotenv()
 app = Flask(__name__)
+admission = AdmissionController()
 
 
 @app.route("/", methods=['GET', 'POST'])
@@ -16,9 +18,22 @@ def get_calendar():
         request_data = service.clean_input_data(request_data)
     except service.InvalidInputData as ex:
         return Response("No input data", status=400, mimetype='text/html')
-    calendar = service.get_calendar(request_data)
+    try:
+        mortgage = service.get_mortgage(request_data)
+    except ValueError as ex:
+        return Response(f"Invalid input data: {ex}", status=400, mimetype='text/html')
+    draw_chart = service.chart_requested(request_data)
+    try:
+        ticket = admission.admit(estimate_cost(mortgage, chart=draw_chart), estimate_cost(mortgage, chart=False))
+    except Overloaded as ex:
+        return Response("Service overloaded", status=503, mimetype='text/html',
+                        headers={'Retry-After': str(ex.retry_after)})
+    with ticket:
+        calendar = service.get_calendar(request_data, draw_chart=draw_chart and not ticket.degraded,
+                                        mortgage=mortgage)
     calendar_as_json = service.serilalize(calendar)
-    return Response(calendar_as_json, status=200, mimetype='application/json')
+    headers = {'X-Degraded': 'chart'} if draw_chart and ticket.degraded else {}
+    return Response(calendar_as_json, status=200, mimetype='application/json', headers=headers)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,37 @@
+import argparse
+import sys
+
+from mortgage.service import portfolio
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Calculate portfolio of loans from CSV or Parquet file')
+    parser.add_argument('input', help='CSV or Parquet file with price, initial_payment, period, loan_rate columns '
+                                      'and optional loan_id, rate_schedule, early_payment, first_month, frequency, '
+                                      'early_pay_amount. Loans are calculated as by the API: rate_schedule selects '
+                                      'the variable rate calculator, non-empty early_payment the early payment one')
+    parser.add_argument('output', help='CSV file for per-loan summaries')
+    parser.add_argument('--schedules', help='CSV file for full payment schedules')
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, help='Number of worker processes, CPU count by default')
+    parser.add_argument('--checkpoint', help='JSON file to resume an interrupted run from')
+    return parser.parse_args(argv)
+
+
+def print_progress(loans_done: int, loans_per_second: float):
+    print(f'\rLoans: {loans_done:,}; {loans_per_second:,.0f} loans/s'.replace(',', ' '), end='', file=sys.stderr)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    stats = portfolio.process_portfolio(args.input, args.output, schedules_path=args.schedules,
+                                        chunk_size=args.chunk_size, workers=args.workers,
+                                        checkpoint_path=args.checkpoint, progress=print_progress)
+    print(file=sys.stderr)
+    print(f'Loans: {stats["loans"]:,} (total {stats["loans_total"]:,}); Errors: {stats["errors"]:,}; '
+          f'Chunks: {stats["chunks"]:,}; Elapsed: {stats["elapsed"]:.1f} s; '
+          f'Throughput: {stats["loans_per_second"]:,.0f} loans/s'.replace(',', ' '), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
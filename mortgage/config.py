@@ -5,6 +5,12 @@ load_dotenv()
 
 ROUND = 0
 
+# Admission control of the calculation endpoint, per worker process.
+# Cost is measured in calendar months, see mortgage.service.admission.
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", 4))
+MAX_COST_BUDGET = int(os.getenv("MAX_COST_BUDGET", 6000))
+RETRY_AFTER_SECONDS = int(os.getenv("RETRY_AFTER_SECONDS", 1))
+
 
 def get_api_url():
     host = os.getenv("API")
@@ -1,9 +1,11 @@
 
 import dataclasses
+import json
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import ClassVar
 
+import numpy as np
 import pandas as pd
 import base64
 from io import BytesIO
@@ -109,6 +111,47 @@ class MortgageEP(BaseMortgage):
 # todo: override from_dict method for EP
 
 
+@dataclass
+class MortgageVR(BaseMortgage):
+    """Class Mortgage with variable loan rate.
+    loan_rate applies until the first step of rate_schedule, each step is [month, loan_rate]
+    where month is the first month with the new rate. Early payments are optional."""
+    first_month: int = 0
+    frequency: int = 0
+    early_pay_amount: int = 0
+    rate_schedule: list = dataclasses.field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, d):
+        d = dict(d)
+        rate_schedule = d.pop('rate_schedule', [])
+        mortgage = super().from_dict(d)
+        mortgage.validate_period()
+        mortgage.rate_schedule = cls.parse_rate_schedule(rate_schedule)
+        return mortgage
+
+    def validate_period(self):
+        if int(self.period * self.MONTH_PER_YEAR) < 1:
+            raise ValueError(f'Invalid period: {self.period} years is less than one month')
+
+    @staticmethod
+    def parse_rate_schedule(rate_schedule):
+        """Accepts list of [month, loan_rate] pairs or the same list as JSON string"""
+        try:
+            if isinstance(rate_schedule, str):
+                rate_schedule = json.loads(rate_schedule)
+            steps = sorted([int(month), float(rate)] for month, rate in rate_schedule)
+        except (TypeError, ValueError) as ex:
+            raise ValueError(f'Invalid rate_schedule: expected list of [month, loan_rate] pairs, '
+                             f'got {rate_schedule!r}') from ex
+        months = [month for month, _ in steps]
+        if any(month < 1 for month in months):
+            raise ValueError(f'Invalid rate_schedule: months must start from 1, got {months}')
+        if len(set(months)) != len(months):
+            raise ValueError(f'Invalid rate_schedule: duplicate months in {months}')
+        return steps
+
+
 class ICalculator(ABC):
     """Abstract class of calculator Builder"""
 
@@ -326,6 +369,118 @@ class CalculatorEP(BaseCalculator):
         self.total_payment = self.calendar.monthly_payment.sum() + self.mortgage.additional_payments
 
 
+class CalculatorVR(BaseCalculator):
+    """Calculator with variable loan rate.
+    Calendar is split into segments with constant rate and payment: rate steps and early payments
+    start a new segment, where the residual loan is re-annuitized over the remaining months.
+    Each segment is calculated in closed form:
+    # ОСТАТОК_ДОЛГА_k = ОСТАТОК_ДОЛГА * (1 + СТАВКА) ^ k - ЕЖЕМЕСЯЧНЫЙ_ПЛАТЕЖ * ((1 + СТАВКА) ^ k - 1) / СТАВКА"""
+
+    def __init__(self, mortgage_vr: MortgageVR) -> None:
+        """Create new instance of Mortgage calendar"""
+        super().__init__(mortgage_vr)
+        self.month_rates = np.array([])
+
+    def prepare_data(self) -> None:
+        """Make transformation of input parameters, month_rates holds loan rate for every month"""
+        self.mortgage.validate_period()
+        super().prepare_data()
+        self.month_rates = np.full(self.mortgage.period_month, self.mortgage.month_loan_rate)
+        for month, loan_rate in self.mortgage.rate_schedule:
+            if 1 <= month <= self.mortgage.period_month:
+                self.month_rates[month - 1:] = loan_rate / self.mortgage.MONTH_PER_YEAR / 100
+        self.mortgage.month_loan_rate = self.month_rates[0]
+
+    def common_rate(self) -> None:
+        """# ОБЩАЯ_СТАВКА = (1 + СТАВКА_ПЕРВОГО_МЕСЯЦА) ^ СРОК_ИПОТЕКИ_МЕСЯЦЕВ"""
+        self.mortgage.common_rate = (1 + self.month_rates[0]) ** self.mortgage.period_month
+
+    def monthly_payment(self):
+        """Payment of the first segment, zero rate is allowed"""
+        self.mortgage.monthly_payment, *_ = self.annuity_segment(self.mortgage.total_loan_amount, self.month_rates[0],
+                                                                 self.mortgage.period_month, 1)
+
+    def has_early_payments(self) -> bool:
+        return self.mortgage.frequency > 0 and self.mortgage.early_pay_amount > 0
+
+    def early_payment_months(self) -> set:
+        if not self.has_early_payments():
+            return set()
+        frequency = int(self.mortgage.frequency)
+        first_month = max(int(self.mortgage.first_month), 2)
+        return {month for month in range(first_month, self.mortgage.period_month) if month % frequency == 0}
+
+    def segment_starts(self) -> list:
+        """Zero-based month indexes where a new constant-rate segment starts"""
+        starts = {0}
+        starts.update(int(i) for i in np.flatnonzero(np.diff(self.month_rates)) + 1)
+        starts.update(self.early_payment_months())
+        return sorted(starts)
+
+    @staticmethod
+    def annuity_segment(residual_loan: float, rate: float, months_left: int, length: int):
+        """Payment, percent parts, main parts and residual loan for a constant-rate segment"""
+        k = np.arange(1, length + 1)
+        if rate == 0:
+            payment = residual_loan / months_left
+            residuals = residual_loan - payment * k
+        else:
+            common_rate = (1 + rate) ** months_left
+            payment = residual_loan * rate * common_rate / (common_rate - 1)
+            growth = (1 + rate) ** k
+            residuals = residual_loan * growth - payment * (growth - 1) / rate
+        residuals = np.maximum(residuals, 0)
+        percent_parts = np.concatenate(([residual_loan], residuals[:-1])) * rate
+        main_parts = payment - percent_parts
+        return payment, percent_parts, main_parts, residuals
+
+    def get_calendar(self):
+        """Calculates payments calendar by constant-rate segments"""
+        period_month = self.mortgage.period_month
+        early_payment_months = self.early_payment_months()
+        starts = self.segment_starts()
+        residual_loan = self.mortgage.total_loan_amount
+        self.mortgage.start_monthly_payment = self.mortgage.monthly_payment
+        payments, percent_parts, main_parts, residuals = [], [], [], []
+        for start, end in zip(starts, starts[1:] + [period_month]):
+            payment, percent_part, main_part, residual = self.annuity_segment(
+                residual_loan, self.month_rates[start], period_month - start, end - start)
+            self.mortgage.monthly_payment = payment
+            payments.append(np.full(end - start, payment))
+            percent_parts.append(percent_part)
+            main_parts.append(main_part)
+            residuals.append(residual)
+            residual_loan = residual[-1]
+            if end in early_payment_months:
+                early_payment = self.mortgage.early_pay_amount + \
+                                max(self.mortgage.start_monthly_payment - payment, 0)
+                early_payment = min(early_payment, residual_loan)
+                self.mortgage.additional_payments += early_payment
+                residual_loan -= early_payment
+                residual[-1] = residual_loan
+            if residual_loan <= 0:
+                break
+        _data_dict = {'monthly_payment': np.concatenate(payments),
+                      'main_part': np.concatenate(main_parts),
+                      'percent_part': np.concatenate(percent_parts),
+                      'residual_loan_amount': np.concatenate(residuals),
+                      }
+        _data_dict['percent_cum'] = np.cumsum(_data_dict['percent_part'])
+        self.calendar = pd.DataFrame(data=_data_dict,
+                                     index=pd.RangeIndex(1, _data_dict['monthly_payment'].size + 1, name='month'))
+        self.calendar = self.calendar[['monthly_payment', 'main_part', 'percent_part', 'percent_cum',
+                                       'residual_loan_amount']]
+        self.mortgage.residual_loan = residual_loan
+
+    def get_total_payment(self):
+        self.total_payment = self.calendar.monthly_payment.sum() + self.mortgage.additional_payments
+
+    def get_averages(self):
+        percent_parts = self.calendar.percent_part[self.calendar.percent_part != 0]
+        self.avg_percent_part = int(percent_parts.mean()) if not percent_parts.empty else 0
+        self.avg_monthly_payment = int(self.calendar.monthly_payment[self.calendar.monthly_payment != 0].mean())
+
+
 class ICalculatorBuilder(ABC):
     @abstractmethod
     def build_calculator(self):
@@ -336,7 +491,7 @@ class CalculatorBuilder(ICalculatorBuilder):
     def __init__(self, calculator: ICalculator):
         self.calculator = calculator
 
-    def build_calculator(self):
+    def build_calculator(self, format_calendar: bool = True):
         self.calculator.prepare_data()
         self.calculator.common_rate()
         self.calculator.monthly_payment()
@@ -348,7 +503,8 @@ class CalculatorBuilder(ICalculatorBuilder):
         self.calculator.get_total_payment()
         self.calculator.get_overpayment()
         self.calculator.get_averages()
-        self.calculator.format_calendar()
+        if format_calendar:
+            self.calculator.format_calendar()
         return self.calculator.calendar_as_dict
 
 
@@ -361,7 +517,7 @@ class Chart:
         self.fig = Figure()
         self.ax = self.fig.subplots()
         _xticks = [x for x in range(0, self.calculator.calendar.shape[0], self.PLOT_MONTH_TICKS)]
-        _yticks = [y for y in range(0, (int(round(self.calculator.calendar.monthly_payment[1], 0)) +
+        _yticks = [y for y in range(0, (int(round(self.calculator.calendar.monthly_payment.max(), 0)) +
                                         2 * self.PLOT_PAYMENTS_TICKS), self.PLOT_PAYMENTS_TICKS)]
         _ytickslabels = ['{:,.0f}'.format(y).replace(",", " ") for y in _yticks]
         self.ax.set_xlim(left=0, right=self.calculator.calendar.shape[0])
@@ -0,0 +1,78 @@
+import threading
+from typing import ClassVar
+
+from mortgage import config
+from mortgage.domain.model import BaseMortgage, MortgageEP
+
+
+class Overloaded(Exception):
+    """Raised when the worker has no budget left for a request"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f'Worker is overloaded, retry after {retry_after} s')
+        self.retry_after = retry_after
+
+
+def estimate_cost(mortgage: BaseMortgage, chart: bool = True) -> int:
+    """Estimate cost of a calculation in calendar months.
+    CalculatorEP recalculates the annuity every month, CalculatorVR calculates rate schedules and
+    early payments in closed form and costs no more than a single rate. The chart is rendered at 500 dpi
+    and dominates everything else."""
+    cost = int(mortgage.period * mortgage.MONTH_PER_YEAR)
+    if isinstance(mortgage, MortgageEP):
+        cost *= AdmissionController.EP_COST_FACTOR
+    if chart:
+        cost += AdmissionController.CHART_COST
+    return cost
+
+
+class Ticket:
+    """Admitted request, releases its cost when the calculation is finished"""
+
+    def __init__(self, controller: 'AdmissionController', cost: int, degraded: bool):
+        self.controller = controller
+        self.cost = cost
+        self.degraded = degraded
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.controller.release(self)
+
+
+class AdmissionController:
+    """Limits concurrency and total cost of calculations running in the worker"""
+    EP_COST_FACTOR: ClassVar[int] = 2
+    CHART_COST: ClassVar[int] = 1500
+
+    def __init__(self, max_concurrency: int = config.MAX_CONCURRENT_REQUESTS,
+                 cost_budget: int = config.MAX_COST_BUDGET,
+                 retry_after: int = config.RETRY_AFTER_SECONDS) -> None:
+        self.max_concurrency = max_concurrency
+        self.cost_budget = cost_budget
+        self.retry_after = retry_after
+        self.in_flight: int = 0
+        self.cost_in_flight: int = 0
+        self._lock = threading.Lock()
+
+    def admit(self, cost: int, degraded_cost: int) -> Ticket:
+        """Admit request with full cost, fall back to degraded cost or raise Overloaded.
+        An idle worker always admits the full request, so a single expensive one is never starved."""
+        with self._lock:
+            if self.in_flight >= self.max_concurrency:
+                raise Overloaded(self.retry_after)
+            if self.in_flight == 0 or self.cost_in_flight + cost <= self.cost_budget:
+                ticket = Ticket(self, cost, degraded=False)
+            elif self.cost_in_flight + degraded_cost <= self.cost_budget:
+                ticket = Ticket(self, degraded_cost, degraded=True)
+            else:
+                raise Overloaded(self.retry_after)
+            self.in_flight += 1
+            self.cost_in_flight += ticket.cost
+        return ticket
+
+    def release(self, ticket: Ticket) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.cost_in_flight -= ticket.cost
@@ -0,0 +1,173 @@
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from mortgage.domain.model import BaseCalculator, CalculatorBuilder
+from mortgage.service import service
+
+SUMMARY_COLUMNS = ['loan_id', 'total_loan_amount', 'start_monthly_payment', 'avg_monthly_payment', 'total_payment',
+                   'additional_payments', 'overpayment', 'total_period', 'error']
+
+
+def read_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Read loans from CSV or Parquet file by chunks of chunk_size rows.
+    Row numbers run through the whole file, they are loan ids when loan_id column is missing."""
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        first_row = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            chunk = batch.to_pandas()
+            chunk.index = pd.RangeIndex(first_row, first_row + chunk.shape[0])
+            first_row += chunk.shape[0]
+            yield chunk
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def calculate_loan(loan: dict) -> BaseCalculator:
+    """Calculate single loan with the same calculator as the API route"""
+    calculator = service.get_calculator(service.get_mortgage(loan))
+    CalculatorBuilder(calculator).build_calculator(format_calendar=False)
+    return calculator
+
+
+def calculate_chunk(chunk: pd.DataFrame, with_schedules: bool = False):
+    """Calculate summaries and optionally full schedules for a chunk of loans"""
+    summaries, schedules = [], []
+    for row_id, row in zip(chunk.index, chunk.to_dict('records')):
+        loan = {k: v for k, v in row.items() if not (pd.api.types.is_scalar(v) and (pd.isna(v) or v == ''))}
+        loan_id = loan.get('loan_id', row_id)
+        try:
+            calculator = calculate_loan(loan)
+        except Exception as ex:
+            summaries.append({'loan_id': loan_id, 'error': f'{type(ex).__name__}: {ex}'})
+            continue
+        summaries.append({'loan_id': loan_id,
+                          'total_loan_amount': calculator.mortgage.total_loan_amount,
+                          'start_monthly_payment': calculator.mortgage.start_monthly_payment,
+                          'avg_monthly_payment': calculator.avg_monthly_payment,
+                          'total_payment': calculator.total_payment,
+                          'additional_payments': calculator.mortgage.additional_payments,
+                          'overpayment': calculator.overpayment,
+                          'total_period': calculator.calendar.shape[0],
+                          })
+        if with_schedules:
+            schedule = calculator.calendar.rename_axis('month').reset_index()
+            schedule.insert(0, 'loan_id', loan_id)
+            schedules.append(schedule)
+    summary = pd.DataFrame(summaries, columns=SUMMARY_COLUMNS)
+    schedule = pd.concat(schedules, ignore_index=True) if schedules else None
+    return summary, schedule
+
+
+class Checkpoint:
+    """Chunks already written to the outputs and output sizes after them, stored as JSON.
+    Input file is identified by its path, size and modification time."""
+
+    def __init__(self, path: Optional[str], chunk_size: int, input_path: str, output_paths) -> None:
+        self.path = path
+        self.chunk_size = chunk_size
+        input_stat = os.stat(input_path)
+        self.input = {'path': os.path.abspath(input_path), 'size': input_stat.st_size,
+                      'mtime_ns': input_stat.st_mtime_ns}
+        self.output_paths = sorted(os.path.abspath(path) for path in output_paths if path)
+        self.chunks_done: int = 0
+        self.loans_done: int = 0
+        self.output_sizes: dict = {}
+
+    def load(self) -> None:
+        if self.path and os.path.exists(self.path):
+            with open(self.path) as f:
+                data = json.load(f)
+            if data['chunk_size'] != self.chunk_size:
+                raise ValueError(f'Checkpoint was written with chunk size {data["chunk_size"]}')
+            if data['input'] != self.input:
+                raise ValueError(f'Checkpoint was written for input {data["input"]}')
+            if data['output_paths'] != self.output_paths:
+                raise ValueError(f'Checkpoint was written for outputs {data["output_paths"]}')
+            self.chunks_done = data['chunks_done']
+            self.loans_done = data['loans_done']
+            self.output_sizes = data['output_sizes']
+
+    def save(self) -> None:
+        if self.path:
+            self.output_sizes = {path: os.path.getsize(path) for path in self.output_paths if os.path.exists(path)}
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'chunk_size': self.chunk_size, 'input': self.input, 'output_paths': self.output_paths,
+                           'chunks_done': self.chunks_done, 'loans_done': self.loans_done,
+                           'output_sizes': self.output_sizes}, f)
+            os.replace(tmp_path, self.path)
+
+    def restore_outputs(self) -> None:
+        """Drop rows written after the last checkpoint, or all rows if there is nothing to resume"""
+        for path in self.output_paths:
+            size = self.output_sizes.get(path, 0)
+            current_size = os.path.getsize(path) if os.path.exists(path) else 0
+            if current_size < size:
+                raise ValueError(f'Output {path} is shorter than at the checkpoint, cannot resume')
+            if current_size > size:
+                with open(path, 'r+b') as f:
+                    f.truncate(size)
+
+
+def append_csv(frame: pd.DataFrame, path: str) -> None:
+    frame.to_csv(path, mode='a', index=False, header=not os.path.exists(path) or os.path.getsize(path) == 0)
+
+
+def calculate_chunks(chunks: Iterator[pd.DataFrame], with_schedules: bool, workers: int):
+    """Calculate chunks in a process pool and yield results in input order.
+    At most 2 * workers chunks are in flight, so memory stays bounded for any input size."""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(calculate_chunk, chunk, with_schedules))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def process_portfolio(input_path: str, output_path: str, schedules_path: Optional[str] = None,
+                      chunk_size: int = 1000, workers: Optional[int] = None,
+                      checkpoint_path: Optional[str] = None, progress=None) -> dict:
+    """Calculate portfolio of loans and stream results to CSV files.
+    With checkpoint_path the run resumes after the last chunk written by a previous run."""
+    workers = workers or os.cpu_count() or 1
+    checkpoint = Checkpoint(checkpoint_path, chunk_size, input_path, (output_path, schedules_path))
+    checkpoint.load()
+    resumed = checkpoint.chunks_done > 0
+    checkpoint.restore_outputs()
+
+    chunks = read_chunks(input_path, chunk_size)
+    for _ in range(checkpoint.chunks_done):
+        next(chunks, None)
+
+    started = time.monotonic()
+    loans, errors = 0, 0
+    for summary, schedule in calculate_chunks(chunks, schedules_path is not None, workers):
+        append_csv(summary, output_path)
+        if schedule is not None:
+            append_csv(schedule, schedules_path)
+        loans += summary.shape[0]
+        errors += int(summary.error.notna().sum())
+        checkpoint.chunks_done += 1
+        checkpoint.loans_done += summary.shape[0]
+        checkpoint.save()
+        if progress is not None:
+            progress(checkpoint.loans_done, loans / max(time.monotonic() - started, 1e-9))
+
+    elapsed = time.monotonic() - started
+    return {'loans': loans,
+            'loans_total': checkpoint.loans_done,
+            'errors': errors,
+            'chunks': checkpoint.chunks_done,
+            'resumed': resumed,
+            'elapsed': elapsed,
+            'loans_per_second': loans / elapsed if elapsed > 0 else 0,
+            }
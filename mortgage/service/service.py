@@ -1,20 +1,40 @@
 import json
+from typing import Optional
+
 from flask import Request
 
-from mortgage.domain.model import Mortgage, Calculator, CalculatorBuilder, Chart, MortgageEP, CalculatorEP
+from mortgage.domain.model import BaseMortgage, BaseCalculator, Mortgage, Calculator, CalculatorBuilder, Chart, MortgageEP, CalculatorEP, \
+    MortgageVR, CalculatorVR
 
 
-def get_calendar(request_data: dict):
+def get_mortgage(request_data: dict) -> BaseMortgage:
+    if 'rate_schedule' in request_data:
+        return MortgageVR.from_dict(request_data)
     if 'early_payment' in request_data:
-        mortgage = MortgageEP.from_dict(request_data)
-        calculator = CalculatorEP(mortgage)
-    else:
-        mortgage = Mortgage.from_dict(request_data)
-        calculator = Calculator(mortgage)
-    cb = CalculatorBuilder(calculator)
+        return MortgageEP.from_dict(request_data)
+    return Mortgage.from_dict(request_data)
+
+
+def chart_requested(request_data: dict) -> bool:
+    return str(request_data.get('chart', True)).lower() not in ('0', 'false', 'no')
+
+
+def get_calculator(mortgage: BaseMortgage) -> BaseCalculator:
+    if isinstance(mortgage, MortgageVR):
+        return CalculatorVR(mortgage)
+    if isinstance(mortgage, MortgageEP):
+        return CalculatorEP(mortgage)
+    return Calculator(mortgage)
+
+
+def get_calendar(request_data: dict, draw_chart: bool = True, mortgage: Optional[BaseMortgage] = None):
+    if mortgage is None:
+        mortgage = get_mortgage(request_data)
+    cb = CalculatorBuilder(get_calculator(mortgage))
     builded_calendar_as_dict = cb.build_calculator()
-    chart = Chart(cb.calculator)
-    builded_calendar_as_dict['chart'] = chart.draw_chart()
+    if draw_chart:
+        chart = Chart(cb.calculator)
+        builded_calendar_as_dict['chart'] = chart.draw_chart()
     return builded_calendar_as_dict
 
 
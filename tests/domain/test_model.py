@@ -1,7 +1,8 @@
 from unittest import TestCase
 
 import pytest
-from mortgage.domain.model import Mortgage, MortgageEP, Calculator
+import numpy as np
+from mortgage.domain.model import Mortgage, MortgageEP, Calculator, MortgageVR, CalculatorVR, CalculatorBuilder
 
 
 def test_mortgage_model_init():
@@ -137,3 +138,90 @@ class TestCalculateCalendar(TestCase):
         self.calculator.calculate_first_month()
 
         self.assertEqual(int(98166.67), int(self.calculator.calendar.iloc[0][0]))
+
+
+def test_mortgage_vr_from_dict_parses_rate_schedule():
+    data_dict = {'price': 18,
+                 'initial_payment': 2.5,
+                 'period': 30,
+                 'loan_rate': 0.1,
+                 'rate_schedule': '[[37, 9.5], [13, 7.6]]'}
+    m = MortgageVR.from_dict(data_dict)
+    assert m.loan_rate == 0.1
+    assert m.rate_schedule == [[13, 7.6], [37, 9.5]]
+
+
+@pytest.mark.parametrize('rate_schedule', ['[13, 3]', '[[13, 3', [[0, 7.6]], [[13, 7.6], [13, 9.5]], [[13]]])
+def test_mortgage_vr_from_dict_rejects_invalid_rate_schedule(rate_schedule):
+    data_dict = {'price': 18,
+                 'initial_payment': 2.5,
+                 'period': 30,
+                 'loan_rate': 0,
+                 'rate_schedule': rate_schedule}
+    with pytest.raises(ValueError, match='Invalid rate_schedule'):
+        MortgageVR.from_dict(data_dict)
+
+
+def test_mortgage_vr_from_dict_rejects_period_less_than_month():
+    data_dict = {'price': 18,
+                 'initial_payment': 2.5,
+                 'period': 0.05,
+                 'loan_rate': 7.6}
+    with pytest.raises(ValueError, match='Invalid period'):
+        MortgageVR.from_dict(data_dict)
+
+
+class TestCalculatorVR(TestCase):
+    def setUp(self) -> None:
+        self.data_dict = {'price': 18,
+                          'initial_payment': 2.5,
+                          'period': 30,
+                          'loan_rate': 7.6}
+
+    def build(self, data_dict, calculator_cls, mortgage_cls):
+        calculator = calculator_cls(mortgage_cls.from_dict(data_dict))
+        CalculatorBuilder(calculator).build_calculator()
+        return calculator
+
+    def test_single_rate_equals_base_calculator(self):
+        base = self.build(self.data_dict, Calculator, Mortgage)
+        vr = self.build(dict(self.data_dict, rate_schedule=[]), CalculatorVR, MortgageVR)
+        self.assertEqual(base.calendar.shape, vr.calendar.shape)
+        self.assertTrue(np.allclose(base.calendar.values, vr.calendar.values, atol=1e-3))
+        self.assertAlmostEqual(base.total_payment, vr.total_payment, places=3)
+
+    def test_rate_steps_are_re_annuitized(self):
+        vr = self.build(dict(self.data_dict, loan_rate=0.1, rate_schedule=[[13, 7.6], [61, 9.5]]),
+                        CalculatorVR, MortgageVR)
+        payments = vr.calendar.monthly_payment
+        self.assertEqual(360, vr.calendar.shape[0])
+        self.assertTrue(payments[1] == payments[12] < payments[13] == payments[60] < payments[61])
+        self.assertAlmostEqual(0, vr.calendar.residual_loan_amount.iloc[-1], places=3)
+        self.assertAlmostEqual(vr.mortgage.total_loan_amount, vr.calendar.main_part.sum(), places=3)
+
+    def test_early_payments_with_rate_steps(self):
+        vr = self.build(dict(self.data_dict, rate_schedule=[[13, 9.5]], first_month=24, frequency=1,
+                             early_pay_amount=50000), CalculatorVR, MortgageVR)
+        self.assertLess(vr.calendar.shape[0], 360)
+        self.assertAlmostEqual(0, vr.mortgage.residual_loan, places=3)
+        self.assertAlmostEqual(vr.mortgage.total_loan_amount,
+                               vr.calendar.main_part.sum() + vr.mortgage.additional_payments, places=3)
+
+    def test_zero_rate_promo_period(self):
+        vr = self.build(dict(self.data_dict, loan_rate=0, rate_schedule=[[13, 7.6]]), CalculatorVR, MortgageVR)
+        total_loan_amount = vr.mortgage.total_loan_amount
+        self.assertAlmostEqual(total_loan_amount / 360, vr.mortgage.start_monthly_payment, places=3)
+        self.assertEqual(0, vr.calendar.percent_part[1:12].sum())
+        self.assertLess(vr.calendar.monthly_payment[12], vr.calendar.monthly_payment[13])
+        self.assertAlmostEqual(total_loan_amount, vr.calendar.main_part.sum(), places=3)
+
+    def test_zero_rate_whole_period(self):
+        vr = self.build(dict(self.data_dict, loan_rate=0), CalculatorVR, MortgageVR)
+        self.assertAlmostEqual(vr.mortgage.total_loan_amount, vr.total_payment, places=3)
+        self.assertEqual(0, vr.avg_percent_part)
+        self.assertAlmostEqual(0, vr.overpayment, places=3)
+
+    def test_rate_step_in_first_month_sets_start_payment(self):
+        stepped = self.build(dict(self.data_dict, loan_rate=0, rate_schedule=[[1, 7.6]]), CalculatorVR, MortgageVR)
+        base = self.build(self.data_dict, Calculator, Mortgage)
+        self.assertAlmostEqual(base.calendar.monthly_payment[1], stepped.mortgage.start_monthly_payment, places=3)
@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+import pytest
+from mortgage.domain.model import Mortgage, MortgageEP, MortgageVR
+from mortgage.service.admission import AdmissionController, Overloaded, estimate_cost
+
+
+def test_estimate_cost_grows_with_period_and_chart():
+    short = Mortgage(price=20, initial_payment=2, period=5, loan_rate=7.5)
+    long = Mortgage(price=20, initial_payment=2, period=40, loan_rate=7.5)
+    assert estimate_cost(short, chart=False) == 60
+    assert estimate_cost(long, chart=False) == 480
+    assert estimate_cost(long) == 480 + AdmissionController.CHART_COST
+
+
+def test_estimate_cost_with_early_payment():
+    mortgage = MortgageEP(price=20, initial_payment=2, period=40, loan_rate=7.5)
+    assert estimate_cost(mortgage, chart=False) == 480 * AdmissionController.EP_COST_FACTOR
+
+
+def test_estimate_cost_with_early_pay_amount_on_vr():
+    mortgage = MortgageVR(price=20, initial_payment=2, period=40, loan_rate=7.5, frequency=1, early_pay_amount=50000,
+                          rate_schedule=[[13, 9.5]])
+    assert estimate_cost(mortgage, chart=False) == 480
+
+
+class TestAdmissionController(TestCase):
+    def setUp(self) -> None:
+        self.controller = AdmissionController(max_concurrency=2, cost_budget=1000, retry_after=3)
+
+    def test_idle_worker_admits_expensive_request(self):
+        with self.controller.admit(5000, 500) as ticket:
+            self.assertFalse(ticket.degraded)
+            self.assertEqual(5000, self.controller.cost_in_flight)
+        self.assertEqual(0, self.controller.in_flight)
+        self.assertEqual(0, self.controller.cost_in_flight)
+
+    def test_admit_degraded_when_budget_is_exhausted(self):
+        self.controller.admit(600, 100)
+        ticket = self.controller.admit(600, 300)
+        self.assertTrue(ticket.degraded)
+        self.assertEqual(900, self.controller.cost_in_flight)
+
+    def test_overloaded_when_degraded_cost_does_not_fit(self):
+        self.controller.admit(900, 100)
+        with pytest.raises(Overloaded) as ex:
+            self.controller.admit(600, 300)
+        self.assertEqual(3, ex.value.retry_after)
+
+    def test_overloaded_when_concurrency_is_exhausted(self):
+        self.controller.admit(10, 10)
+        self.controller.admit(10, 10)
+        with pytest.raises(Overloaded):
+            self.controller.admit(10, 10)
@@ -0,0 +1,156 @@
+import pandas as pd
+import pytest
+from mortgage.domain.model import Calculator, CalculatorEP, CalculatorVR
+from mortgage.service import portfolio
+
+LOANS = pd.DataFrame({'loan_id': [1, 2, 3, 4, 5],
+                      'price': [18, 20, 10, 15, 12],
+                      'initial_payment': [2.5, 2, 1, 3, 2],
+                      'period': [30, 20, 10, 15, None],
+                      'loan_rate': [7.6, 7.5, 9, 8, 7],
+                      'rate_schedule': [None, '[[13, 9.5]]', None, None, None],
+                      'early_payment': [None, None, 1, None, None],
+                      'first_month': [None, None, 24, None, None],
+                      'frequency': [None, None, 1, None, None],
+                      'early_pay_amount': [None, None, 50000, None, None],
+                      })
+
+
+def test_calculate_chunk():
+    summary, schedule = portfolio.calculate_chunk(LOANS, with_schedules=True)
+    assert list(summary.loan_id) == [1, 2, 3, 4, 5]
+    assert list(summary.total_period[:2]) == [360, 240]
+    assert summary.total_period[2] < 120
+    assert summary.error[:4].isna().all()
+    assert summary.error[4].startswith('TypeError')
+    assert schedule.shape[0] == summary.total_period[:4].sum()
+
+
+def test_calculate_chunk_records_any_loan_error():
+    chunk = LOANS.iloc[:3].assign(loan_rate=[0, 0, 9])
+    summary, _ = portfolio.calculate_chunk(chunk)
+    assert list(summary.loan_id) == [1, 2, 3]
+    assert summary.error[0].startswith('ZeroDivisionError')
+    assert pd.isna(summary.error[1])
+    assert summary.total_period[1] == 240
+    assert pd.isna(summary.error[2])
+
+
+def test_calculate_loan_uses_route_calculator():
+    loans = LOANS.iloc[:3].to_dict('records')
+    assert type(portfolio.calculate_loan({k: v for k, v in loans[0].items() if not pd.isna(v)})) is Calculator
+    assert type(portfolio.calculate_loan({k: v for k, v in loans[1].items() if not pd.isna(v)})) is CalculatorVR
+    assert type(portfolio.calculate_loan({k: v for k, v in loans[2].items() if not pd.isna(v)})) is CalculatorEP
+
+
+def interrupt_on_second_write(monkeypatch):
+    """Crash after the second chunk is written but before its checkpoint is saved"""
+    append_csv = portfolio.append_csv
+    calls = []
+
+    def interrupted_append_csv(frame, path):
+        append_csv(frame, path)
+        calls.append(path)
+        if len(calls) == 2:
+            raise RuntimeError('interrupted')
+
+    monkeypatch.setattr(portfolio, 'append_csv', interrupted_append_csv)
+
+
+def test_process_portfolio_resumes_from_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    LOANS.to_csv('loans.csv', index=False)
+    with monkeypatch.context() as m:
+        interrupt_on_second_write(m)
+        with pytest.raises(RuntimeError):
+            portfolio.process_portfolio('loans.csv', 'summary.csv', chunk_size=2, workers=1,
+                                        checkpoint_path='checkpoint.json')
+    assert list(pd.read_csv('summary.csv').loan_id) == [1, 2, 3, 4]
+
+    stats = portfolio.process_portfolio('loans.csv', str(tmp_path / 'summary.csv'), chunk_size=2, workers=1,
+                                        checkpoint_path='checkpoint.json')
+
+    assert stats['resumed']
+    assert stats['loans'] == 3
+    assert stats['loans_total'] == 5
+    assert stats['chunks'] == 3
+    assert stats['errors'] == 1
+    assert list(pd.read_csv('summary.csv').loan_id) == [1, 2, 3, 4, 5]
+
+
+def test_process_portfolio_refuses_resume_with_other_outputs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    LOANS.to_csv('loans.csv', index=False)
+    with monkeypatch.context() as m:
+        interrupt_on_second_write(m)
+        with pytest.raises(RuntimeError):
+            portfolio.process_portfolio('loans.csv', 'summary.csv', chunk_size=2, workers=1,
+                                        checkpoint_path='checkpoint.json')
+
+    with pytest.raises(ValueError, match='outputs'):
+        portfolio.process_portfolio('loans.csv', 'summary.csv', schedules_path='schedules.csv', chunk_size=2,
+                                    workers=1, checkpoint_path='checkpoint.json')
+    assert list(pd.read_csv('summary.csv').loan_id) == [1, 2, 3, 4]
+
+
+def test_process_portfolio_refuses_resume_with_changed_input(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    LOANS.to_csv('loans.csv', index=False)
+    with monkeypatch.context() as m:
+        interrupt_on_second_write(m)
+        with pytest.raises(RuntimeError):
+            portfolio.process_portfolio('loans.csv', 'summary.csv', chunk_size=2, workers=1,
+                                        checkpoint_path='checkpoint.json')
+    LOANS.iloc[:4].to_csv('loans.csv', index=False)
+
+    with pytest.raises(ValueError, match='input'):
+        portfolio.process_portfolio('loans.csv', 'summary.csv', chunk_size=2, workers=1,
+                                    checkpoint_path='checkpoint.json')
+    assert list(pd.read_csv('summary.csv').loan_id) == [1, 2, 3, 4]
+
+
+def test_process_portfolio_writes_schedules(tmp_path):
+    input_path = str(tmp_path / 'loans.csv')
+    output_path = str(tmp_path / 'summary.csv')
+    schedules_path = str(tmp_path / 'schedules.csv')
+    LOANS.to_csv(input_path, index=False)
+
+    stats = portfolio.process_portfolio(input_path, output_path, schedules_path=schedules_path,
+                                        chunk_size=2, workers=2)
+
+    summary = pd.read_csv(output_path)
+    schedules = pd.read_csv(schedules_path)
+    assert stats['loans'] == 5
+    assert list(summary.loan_id) == [1, 2, 3, 4, 5]
+    assert schedules.shape[0] == summary.total_period.sum()
+    assert list(schedules.columns[:2]) == ['loan_id', 'month']
+
+
+def test_process_portfolio_reads_parquet(tmp_path):
+    pytest.importorskip('pyarrow')
+    input_path = str(tmp_path / 'loans.parquet')
+    output_path = str(tmp_path / 'summary.csv')
+    LOANS.to_parquet(input_path, index=False)
+
+    stats = portfolio.process_portfolio(input_path, output_path, chunk_size=2, workers=1)
+
+    summary = pd.read_csv(output_path)
+    assert stats['chunks'] == 3
+    assert list(summary.loan_id) == [1, 2, 3, 4, 5]
+    assert list(summary.total_period[:2]) == [360, 240]
+
+
+@pytest.mark.parametrize('file_name', ['loans.csv', 'loans.parquet'])
+def test_process_portfolio_numbers_loans_without_loan_id(tmp_path, file_name):
+    input_path = str(tmp_path / file_name)
+    output_path = str(tmp_path / 'summary.csv')
+    loans = LOANS.drop(columns=['loan_id'])
+    if file_name.endswith('.parquet'):
+        pytest.importorskip('pyarrow')
+        loans.to_parquet(input_path, index=False)
+    else:
+        loans.to_csv(input_path, index=False)
+
+    portfolio.process_portfolio(input_path, output_path, chunk_size=2, workers=1)
+
+    assert list(pd.read_csv(output_path).loan_id) == [0, 1, 2, 3, 4]
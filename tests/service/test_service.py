@@ -1,6 +1,6 @@
 from unittest import TestCase
 
-from mortgage.service import service
+from mortgage.service import service, portfolio
 
 
 class TestServiceGetCalendar(TestCase):
@@ -17,3 +17,23 @@ class TestServiceGetCalendar(TestCase):
     def test_service_get_calendar_dict_is_not_empty(self):
         self.assertTrue(bool(self.calendar))
 
+
+class TestServiceEarlyPayment(TestCase):
+    def setUp(self) -> None:
+        self.request_data = {'price': 20,
+                             'initial_payment': 2,
+                             'period': 30,
+                             'loan_rate': 7.5,
+                             'early_payment': 1,
+                             'first_month': 24,
+                             'frequency': 1,
+                             'early_pay_amount': 50000}
+
+    def test_service_early_payment_matches_portfolio(self):
+        calendar = service.get_calendar(self.request_data, draw_chart=False)
+        calculator = portfolio.calculate_loan(self.request_data)
+        last_month = calculator.calendar.shape[0]
+        self.assertLess(last_month, 360)
+        self.assertEqual(last_month, len(calendar))
+        self.assertEqual('{:,}'.format(int(calculator.calendar.monthly_payment[last_month])).replace(',', ' '),
+                         calendar[last_month]['monthly_payment'])
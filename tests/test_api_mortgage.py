@@ -0,0 +1,54 @@
+import json
+from unittest import TestCase
+
+from mortgage import api_mortgage
+from mortgage.service.admission import AdmissionController
+
+INPUT_PARAMS = '/?price=18&initial_payment=2.5&period=30&loan_rate=7.6'
+
+
+class TestAdmissionInAPI(TestCase):
+    def setUp(self) -> None:
+        self.admission = api_mortgage.admission
+        self.client = api_mortgage.app.test_client()
+
+    def tearDown(self) -> None:
+        api_mortgage.admission = self.admission
+
+    def test_api_returns_chart_when_budget_is_available(self):
+        api_mortgage.admission = AdmissionController(max_concurrency=2, cost_budget=10000, retry_after=3)
+        r = self.client.get(INPUT_PARAMS)
+        self.assertEqual(200, r.status_code)
+        self.assertNotIn('X-Degraded', r.headers)
+        self.assertIn('chart', json.loads(r.data))
+
+    def test_api_drops_chart_when_budget_is_short(self):
+        api_mortgage.admission = AdmissionController(max_concurrency=2, cost_budget=1000, retry_after=3)
+        api_mortgage.admission.admit(100, 100)
+        r = self.client.get(INPUT_PARAMS)
+        self.assertEqual(200, r.status_code)
+        self.assertEqual('chart', r.headers['X-Degraded'])
+        self.assertNotIn('chart', json.loads(r.data))
+        self.assertIn('1', json.loads(r.data))
+
+    def test_api_returns_503_when_overloaded(self):
+        api_mortgage.admission = AdmissionController(max_concurrency=1, cost_budget=1000, retry_after=3)
+        api_mortgage.admission.admit(100, 100)
+        r = self.client.get(INPUT_PARAMS)
+        self.assertEqual(503, r.status_code)
+        self.assertEqual('3', r.headers['Retry-After'])
+
+
+class TestVariableRateInAPI(TestCase):
+    def setUp(self) -> None:
+        self.client = api_mortgage.app.test_client()
+
+    def test_api_zero_rate_promo_period(self):
+        r = self.client.get(INPUT_PARAMS.replace('loan_rate=7.6', 'loan_rate=0') + '&rate_schedule=[[13,7]]&chart=0')
+        self.assertEqual(200, r.status_code)
+        self.assertIn('1', json.loads(r.data))
+
+    def test_api_invalid_rate_schedule_returns_400(self):
+        r = self.client.get(INPUT_PARAMS + '&rate_schedule=[13,3]')
+        self.assertEqual(400, r.status_code)
+        self.assertIn('Invalid rate_schedule', r.text)
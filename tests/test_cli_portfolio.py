@@ -0,0 +1,27 @@
+import pandas as pd
+
+from mortgage import cli_portfolio
+
+LOANS = pd.DataFrame({'loan_id': [1, 2, 3],
+                      'price': [18, 20, 10],
+                      'initial_payment': [2.5, 2, 1],
+                      'period': [30, 20, 10],
+                      'loan_rate': [7.6, 7.5, 9],
+                      })
+
+
+def test_main_writes_outputs_and_summary(tmp_path, capsys):
+    input_path = str(tmp_path / 'loans.csv')
+    output_path = str(tmp_path / 'summary.csv')
+    schedules_path = str(tmp_path / 'schedules.csv')
+    LOANS.to_csv(input_path, index=False)
+
+    cli_portfolio.main([input_path, output_path, '--schedules', schedules_path, '--chunk-size', '2',
+                        '--workers', '1', '--checkpoint', str(tmp_path / 'checkpoint.json')])
+
+    summary = pd.read_csv(output_path)
+    assert list(summary.loan_id) == [1, 2, 3]
+    assert pd.read_csv(schedules_path).shape[0] == summary.total_period.sum()
+    err = capsys.readouterr().err
+    assert 'Loans: 3 (total 3); Errors: 0; Chunks: 2;' in err
+    assert 'Throughput:' in err